@@ -0,0 +1,138 @@
+import contextlib
+import functools
+import math
+import threading
+import time
+
+from flask import jsonify, request
+
+
+class AdmissionRejected(Exception):
+    """Raised by ``AdmissionLimiter.admit`` when a request is turned away"""
+
+    def __init__(self, status, retry_after):
+        super().__init__(f"request rejected with {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+    def response(self):
+        response = jsonify({'error': 'Server is busy, try again shortly'})
+        response.headers['Retry-After'] = str(self.retry_after)
+        return response, self.status
+
+
+class AdmissionLimiter:
+    """Concurrency limit with a bounded, deadline-aware wait queue for one class of routes.
+
+    Up to ``max_concurrency`` requests run at once and up to ``max_queue`` more
+    may wait. A request is turned away straight away (429) when the queue is
+    full or its estimated wait, from the moving average service time, exceeds
+    its deadline; one that waits past its deadline gets a 503. Both carry a
+    Retry-After header. Clients can shorten the deadline with ``X-Request-Timeout``
+    (seconds).
+    """
+
+    def __init__(self, name, max_concurrency, max_queue, max_wait_seconds, enabled=True):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait_seconds
+        self.enabled = enabled
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._waiting = 0
+        self._service_time = 0.05
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._max_queue_depth = 0
+
+    def _estimated_wait(self, position):
+        return position * self._service_time / self.max_concurrency
+
+    def _retry_after(self):
+        return max(1, math.ceil(self._estimated_wait(self._waiting + 1)))
+
+    def acquire(self, max_wait):
+        """Wait for a slot; returns None once admitted or (status, retry_after) when rejected"""
+        with self._condition:
+            if self._in_flight < self.max_concurrency and self._waiting == 0:
+                self._in_flight += 1
+                self._admitted += 1
+                return None
+
+            if self._waiting >= self.max_queue or self._estimated_wait(self._waiting + 1) > max_wait:
+                self._rejected += 1
+                return 429, self._retry_after()
+
+            self._waiting += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._waiting)
+            deadline = time.monotonic() + max_wait
+            try:
+                while self._in_flight >= self.max_concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timed_out += 1
+                        return 503, self._retry_after()
+                    self._condition.wait(remaining)
+                self._in_flight += 1
+                self._admitted += 1
+                return None
+            finally:
+                self._waiting -= 1
+
+    def release(self, elapsed):
+        with self._condition:
+            self._in_flight -= 1
+            self._service_time = 0.9 * self._service_time + 0.1 * elapsed
+            self._condition.notify()
+
+    def _request_max_wait(self):
+        try:
+            requested = float(request.headers.get('X-Request-Timeout', self.max_wait))
+        except ValueError:
+            requested = self.max_wait
+        return max(0.0, min(self.max_wait, requested))
+
+    @contextlib.contextmanager
+    def admit(self):
+        """Hold a slot for the duration of the with block; raises AdmissionRejected when none is free in time"""
+        if not self.enabled:
+            yield
+            return
+
+        rejection = self.acquire(self._request_max_wait())
+        if rejection is not None:
+            raise AdmissionRejected(*rejection)
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def limit(self, view):
+        """Decorator that admits a route through this limiter"""
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                with self.admit():
+                    return view(*args, **kwargs)
+            except AdmissionRejected as e:
+                return e.response()
+
+        return wrapper
+
+    def stats(self):
+        with self._condition:
+            return {
+                'in_flight': self._in_flight,
+                'queue_depth': self._waiting,
+                'max_queue_depth': self._max_queue_depth,
+                'concurrency_limit': self.max_concurrency,
+                'queue_limit': self.max_queue,
+                'admitted': self._admitted,
+                'rejected': self._rejected,
+                'timed_out': self._timed_out,
+                'avg_service_ms': round(self._service_time * 1000, 2),
+            }
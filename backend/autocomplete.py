@@ -0,0 +1,185 @@
+import heapq
+import unicodedata
+from bisect import bisect_left, insort
+
+from indexes import MovieIndex
+
+AUTOCOMPLETE_PROJECTION = {'title': 1, 'director': 1, 'release_year': 1, 'rating': 1}
+
+# Only the first few words of a title or director are indexed
+MAX_WORD_STARTS = 8
+# Prefixes up to this length match so many words that their ranked results are cached
+SHORT_PREFIX_LENGTH = 2
+
+
+def fold(text):
+    """Case-fold and strip accents so that "Amélie" matches "ame" """
+    decomposed = unicodedata.normalize('NFKD', text if isinstance(text, str) else '')
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.casefold().split())
+
+
+def suggestion_words(movie):
+    """Folded title and director, and the distinct words they are matched by"""
+    texts = tuple(fold(movie.get(field)) for field in ('title', 'director'))
+    words = set()
+    for text in texts:
+        words.update(word for word in text.split(' ')[:MAX_WORD_STARTS] if word)
+    return texts, words
+
+
+class AutocompleteIndex(MovieIndex):
+    """Word prefix index over movie titles and directors, ranked by rating.
+
+    Every distinct word has a posting list of movie ids kept in rank order
+    (rating, then title), and the words themselves sit in one sorted
+    vocabulary. A prefix lookup bisects the vocabulary and lazily merges the
+    matching posting lists, stopping as soon as ``limit`` movies are found.
+    One- and two-letter prefixes match thousands of words, so their best
+    ``max_results`` movies are cached and patched on every write.
+    """
+
+    name = 'autocomplete'
+
+    def __init__(self, max_results=50):
+        super().__init__()
+        self.max_results = max_results
+        self._movies = {}
+        self._vocabulary = []
+        self._postings = {}
+        self._short = {}
+
+    def _rank(self, movie_id):
+        return self._movies[movie_id][1]
+
+    def _load(self, collection):
+        movies = {}
+        postings = {}
+        for movie in collection.find({}, AUTOCOMPLETE_PROJECTION):
+            entry = self._entry(movie)
+            movie_id = entry[0]['_id']
+            movies[movie_id] = entry
+            for word in entry[3]:
+                postings.setdefault(word, []).append(movie_id)
+        for movie_ids in postings.values():
+            movie_ids.sort(key=lambda movie_id: movies[movie_id][1])
+        return movies, sorted(postings), postings
+
+    def _install(self, state):
+        self._movies, self._vocabulary, self._postings = state
+        self._short = {}
+
+    @staticmethod
+    def _entry(movie):
+        record = {
+            '_id': str(movie['_id']),
+            'title': movie.get('title', ''),
+            'director': movie.get('director', ''),
+            'release_year': movie.get('release_year'),
+            'rating': movie.get('rating') if isinstance(movie.get('rating'), (int, float)) else 0.0,
+        }
+        texts, words = suggestion_words(movie)
+        rank = (-record['rating'], texts[0], record['_id'])
+        return record, rank, texts, words
+
+    @staticmethod
+    def _short_prefixes(words):
+        return {word[:length] for word in words for length in range(1, min(len(word), SHORT_PREFIX_LENGTH) + 1)}
+
+    def _upsert(self, movie):
+        movie_id = str(movie['_id'])
+        self._remove(movie_id)
+        entry = self._entry(movie)
+        self._movies[movie_id] = entry
+        rank, words = entry[1], entry[3]
+
+        for word in words:
+            movie_ids = self._postings.get(word)
+            if movie_ids is None:
+                movie_ids = self._postings[word] = []
+                insort(self._vocabulary, word)
+            insort(movie_ids, movie_id, key=self._rank)
+
+        for prefix in self._short_prefixes(words):
+            cached = self._short.get(prefix)
+            if cached is None:
+                continue
+            position = bisect_left(cached, rank, key=self._rank)
+            # A cached list shorter than max_results holds every match, a full one the best max_results
+            if position < self.max_results:
+                cached.insert(position, movie_id)
+                del cached[self.max_results:]
+
+    def _remove(self, movie_id):
+        entry = self._movies.get(movie_id)
+        if entry is None:
+            return
+        rank, words = entry[1], entry[3]
+
+        for word in words:
+            movie_ids = self._postings[word]
+            del movie_ids[bisect_left(movie_ids, rank, key=self._rank)]
+            if not movie_ids:
+                del self._postings[word]
+                del self._vocabulary[bisect_left(self._vocabulary, word)]
+
+        for prefix in self._short_prefixes(words):
+            cached = self._short.get(prefix)
+            if cached is None:
+                continue
+            position = bisect_left(cached, rank, key=self._rank)
+            if position < len(cached) and cached[position] == movie_id:
+                if len(cached) >= self.max_results:
+                    # The next best match is unknown: recompute on the next lookup
+                    del self._short[prefix]
+                else:
+                    del cached[position]
+
+        del self._movies[movie_id]
+
+    def _ranked_matches(self, word_prefix):
+        """Ids of movies with a word starting with word_prefix, best first and without repeats"""
+        start = bisect_left(self._vocabulary, word_prefix)
+        end = bisect_left(self._vocabulary, word_prefix + '\U0010ffff', start)
+        postings = [self._postings[word] for word in self._vocabulary[start:end]]
+        seen = set()
+        for movie_id in heapq.merge(*postings, key=self._rank):
+            if movie_id not in seen:
+                seen.add(movie_id)
+                yield movie_id
+
+    def _short_matches(self, prefix):
+        cached = self._short.get(prefix)
+        if cached is None:
+            cached = self._short[prefix] = []
+            for movie_id in self._ranked_matches(prefix):
+                cached.append(movie_id)
+                if len(cached) >= self.max_results:
+                    break
+        return cached
+
+    def suggest(self, prefix, limit=10):
+        """Return up to limit movies whose title or director has a word starting with prefix"""
+        folded = fold(prefix)
+        if not folded:
+            return []
+
+        with self._lock:
+            if ' ' in folded:
+                # Phrase prefix: walk the movies containing its first word, best first
+                first_word = folded.split(' ', 1)[0]
+                candidates = (
+                    movie_id for movie_id in self._postings.get(first_word, ())
+                    if any((' ' + text).find(' ' + folded) >= 0 for text in self._movies[movie_id][2])
+                )
+            elif len(folded) <= SHORT_PREFIX_LENGTH and limit <= self.max_results:
+                candidates = self._short_matches(folded)
+            else:
+                candidates = self._ranked_matches(folded)
+
+            matches = []
+            for movie_id in candidates:
+                matches.append(self._movies[movie_id][0])
+                if len(matches) >= limit:
+                    break
+        return matches
@@ -0,0 +1,116 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, WriteError
+
+
+class InsertBatcher:
+    """Write-behind batcher that turns many concurrent inserts into few insert_many calls.
+
+    Documents get their ``_id`` assigned on submit and are flushed by a background
+    thread once ``max_batch_size`` documents are queued or ``max_delay_ms`` has
+    passed since the first one. Every submit returns a Future that resolves to the
+    inserted id, or to the error MongoDB reported for that document. Once the
+    futures are resolved, ``on_inserted`` receives the inserted documents of one
+    or more batches on its own thread, so slow follow-up work never holds up
+    the next flush.
+    """
+
+    def __init__(self, collection, max_batch_size=500, max_delay_ms=10, max_queue_size=10000, on_inserted=None):
+        self._collection = collection
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000.0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._documents = 0
+        self._failures = 0
+
+        self._on_inserted = on_inserted
+        self._inserted = queue.Queue()
+
+        self._thread = threading.Thread(target=self._run, name='insert-batcher', daemon=True)
+        self._thread.start()
+        if on_inserted is not None:
+            threading.Thread(target=self._notify, name='insert-batcher-notify', daemon=True).start()
+
+    def submit(self, document):
+        """Queue a document for insertion; raises queue.Full when the batcher is saturated"""
+        document.setdefault('_id', ObjectId())
+        future = Future()
+        self._queue.put_nowait((document, future))
+        return future
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'queued': self._queue.qsize(),
+                'batches': self._batches,
+                'documents': self._documents,
+                'failures': self._failures,
+                'avg_batch_size': round(self._documents / self._batches, 2) if self._batches else 0,
+            }
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch):
+        documents = [document for document, _ in batch]
+        errors = {}
+        try:
+            self._collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            details = e.details or {}
+            for error in details.get('writeErrors', []):
+                errors[error['index']] = WriteError(error.get('errmsg'), error.get('code'), error)
+            # Inserted but not as durable as requested: report it to every caller still waiting
+            for error in details.get('writeConcernErrors', []):
+                for index in range(len(batch)):
+                    errors.setdefault(index, WriteError(error.get('errmsg'), error.get('code'), error))
+        except Exception as e:
+            print(f"Error flushing insert batch: {e}")
+            errors = {index: e for index in range(len(batch))}
+
+        with self._stats_lock:
+            self._batches += 1
+            self._documents += len(batch)
+            self._failures += len(errors)
+
+        inserted = []
+        for index, (document, future) in enumerate(batch):
+            if index in errors:
+                future.set_exception(errors[index])
+            else:
+                future.set_result(document['_id'])
+                inserted.append(document)
+
+        if inserted and self._on_inserted is not None:
+            self._inserted.put(inserted)
+
+    def _notify(self):
+        while True:
+            documents = self._inserted.get()
+            # Batches flushed while the callback was busy are handed over together
+            while True:
+                try:
+                    documents += self._inserted.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                self._on_inserted(documents)
+            except Exception as e:
+                print(f"Error handling inserted batch: {e}")
@@ -0,0 +1,96 @@
+import threading
+import time
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs identical concurrent calls once and hands every caller the same result.
+
+    Callers with the same key that arrive while a call is in flight wait for it
+    instead of starting their own. With ``ttl_seconds`` > 0 the result is also
+    kept for that long. ``invalidate`` drops cached results and detaches
+    in-flight calls, so nobody joins a read that started before a write.
+    """
+
+    def __init__(self, ttl_seconds=0.0, max_entries=1024):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._results = {}
+        self._generation = 0
+        self._calls = 0
+        self._executions = 0
+        self._shared = 0
+        self._cache_hits = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            self._calls += 1
+            cached = self._results.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                self._cache_hits += 1
+                return cached[1]
+
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._in_flight[key] = call
+                self._executions += 1
+                generation = self._generation
+            else:
+                self._shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._in_flight.get(key) is call:
+                    del self._in_flight[key]
+                if call.error is None and self.ttl > 0 and generation == self._generation:
+                    self._store(key, call.value)
+            call.done.set()
+
+    def _store(self, key, value):
+        now = time.monotonic()
+        if len(self._results) >= self.max_entries:
+            self._results = {k: v for k, v in self._results.items() if v[0] > now}
+            if len(self._results) >= self.max_entries:
+                self._results.pop(next(iter(self._results)))
+        self._results[key] = (now + self.ttl, value)
+
+    def invalidate(self):
+        """Forget cached results and stop new callers from joining calls already in flight"""
+        with self._lock:
+            self._generation += 1
+            self._results.clear()
+            self._in_flight.clear()
+
+    def stats(self):
+        with self._lock:
+            served_without_query = self._shared + self._cache_hits
+            return {
+                'requests': self._calls,
+                'queries': self._executions,
+                'coalesced': self._shared,
+                'cache_hits': self._cache_hits,
+                'in_flight': len(self._in_flight),
+                'coalescing_ratio': round(served_without_query / self._calls, 4) if self._calls else 0,
+            }
@@ -17,9 +17,66 @@ class Config:
     else:
         MONGO_URI = f"mongodb://{MONGO_HOST}:{MONGO_PORT}/{DATABASE_NAME}"
 
+    # Requests fail fast instead of hanging when MongoDB is unreachable
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+
+    # Readiness: background database checks, reconnect backoff and warm-up before the pod takes traffic
+    READINESS_CHECK_INTERVAL_SECONDS = float(os.getenv('READINESS_CHECK_INTERVAL_SECONDS', '10'))
+    RECONNECT_MAX_BACKOFF_SECONDS = float(os.getenv('RECONNECT_MAX_BACKOFF_SECONDS', '30'))
+    # Run the movie list query once before going ready (fills the response cache when COALESCE_TTL_SECONDS > 0)
+    PREWARM_READ_CACHE = os.getenv('PREWARM_READ_CACHE', 'False').lower() == 'true'
+
+    # In-memory indexes follow a change stream on replica sets. A standalone server has none: there they
+    # only see this process's writes, unless INDEX_RESYNC_INTERVAL_SECONDS > 0 rebuilds them that often
+    # (a full collection scan, only worth it when something else writes to MongoDB)
+    INDEX_RESYNC_INTERVAL_SECONDS = float(os.getenv('INDEX_RESYNC_INTERVAL_SECONDS', '0'))
+    INDEX_MAX_LAG_SECONDS = float(os.getenv('INDEX_MAX_LAG_SECONDS', '10'))
+
     # Flask configuration
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-here')
     DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
 
     # CORS configuration
-    CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*')
\ No newline at end of file
+    CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*')
+
+    # Write-behind batching for POST /api/movies (opt-in, for bulk catalog syncs)
+    INSERT_BATCHING = os.getenv('INSERT_BATCHING', 'False').lower() == 'true'
+    INSERT_BATCH_SIZE = int(os.getenv('INSERT_BATCH_SIZE', '500'))
+    INSERT_BATCH_DELAY_MS = float(os.getenv('INSERT_BATCH_DELAY_MS', '10'))
+    INSERT_BATCH_QUEUE_SIZE = int(os.getenv('INSERT_BATCH_QUEUE_SIZE', '10000'))
+    # Durability trade-off: w=0 does not wait for the server, w=majority survives a primary failover,
+    # journal=true waits for the on-disk journal
+    INSERT_BATCH_WRITE_CONCERN = os.getenv('INSERT_BATCH_WRITE_CONCERN', '1')
+    INSERT_BATCH_JOURNAL = os.getenv('INSERT_BATCH_JOURNAL', 'False').lower() == 'true'
+    # When false, requests are answered with 202 as soon as the movie is queued
+    INSERT_BATCH_WAIT = os.getenv('INSERT_BATCH_WAIT', 'True').lower() == 'true'
+    INSERT_BATCH_TIMEOUT_SECONDS = float(os.getenv('INSERT_BATCH_TIMEOUT_SECONDS', '10'))
+
+    # Single-flight coalescing of identical concurrent list and search requests
+    COALESCE_READS = os.getenv('COALESCE_READS', 'True').lower() == 'true'
+    # Optionally keep coalesced responses for a short time (0 disables caching)
+    COALESCE_TTL_SECONDS = float(os.getenv('COALESCE_TTL_SECONDS', '0'))
+    COALESCE_MAX_ENTRIES = int(os.getenv('COALESCE_MAX_ENTRIES', '1024'))
+
+    # Admission control: separate concurrency budgets for cheap point reads and expensive scans
+    ADMISSION_CONTROL = os.getenv('ADMISSION_CONTROL', 'True').lower() == 'true'
+    POINT_READ_CONCURRENCY = int(os.getenv('POINT_READ_CONCURRENCY', '32'))
+    POINT_READ_QUEUE = int(os.getenv('POINT_READ_QUEUE', '64'))
+    POINT_READ_MAX_WAIT_SECONDS = float(os.getenv('POINT_READ_MAX_WAIT_SECONDS', '0.5'))
+    SCAN_CONCURRENCY = int(os.getenv('SCAN_CONCURRENCY', '4'))
+    SCAN_QUEUE = int(os.getenv('SCAN_QUEUE', '16'))
+    SCAN_MAX_WAIT_SECONDS = float(os.getenv('SCAN_MAX_WAIT_SECONDS', '2'))
+
+    # Read routing by route class. List, search, facets and exports tolerate slightly stale data
+    # and can be served by secondaries; point reads stay on the primary by default. A point read that
+    # sends the X-Causal-Token of an earlier write sees that write whichever member serves it.
+    SCAN_READ_PREFERENCE = os.getenv('SCAN_READ_PREFERENCE', 'secondaryPreferred')
+    POINT_READ_PREFERENCE = os.getenv('POINT_READ_PREFERENCE', 'primary')
+    # MongoDB requires at least 90 seconds; -1 means no staleness limit
+    MAX_STALENESS_SECONDS = int(os.getenv('MAX_STALENESS_SECONDS', '90'))
+
+    # Profiling and other /api/debug endpoints are disabled unless an admin token is set
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+    # Low-rate continuous stack sampling of request threads (0 disables it)
+    PROFILE_SAMPLE_HZ = float(os.getenv('PROFILE_SAMPLE_HZ', '0'))
+    PROFILE_MAX_SECONDS = int(os.getenv('PROFILE_MAX_SECONDS', '60'))
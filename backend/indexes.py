@@ -0,0 +1,282 @@
+import threading
+import time
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+# $changeStream is only available on replica sets and sharded clusters
+CHANGE_STREAMS_UNSUPPORTED = 40573
+# The stream cannot be resumed: its position fell off the oplog or its token is no longer valid
+CHANGE_STREAM_LOST = (280, 286)
+
+
+class MovieIndex:
+    """Base class for in-memory indexes over the movies collection.
+
+    Subclasses implement ``_load`` (build fresh state from the collection),
+    ``_install``, ``_upsert`` and ``_remove``. Writes that arrive while a
+    build is running are journaled and replayed on top of the loaded state.
+    Builds of one index never overlap: a second one waits for the first.
+    ``IndexSync`` feeds the writes of every backend process into the index.
+    """
+
+    name = 'movie'
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._journal = None
+        self.ready = False
+
+    def build(self, collection):
+        """Load the index from the collection and swap it in"""
+        with self._build_lock:
+            with self._lock:
+                self._journal = []
+
+            try:
+                state = self._load(collection)
+            except Exception:
+                with self._lock:
+                    self._journal = None
+                raise
+
+            with self._lock:
+                self._install(state)
+                journal, self._journal = self._journal, None
+                for operation, argument in journal:
+                    try:
+                        operation(argument)
+                    except Exception as e:
+                        print(f"❌ Skipped a write the {self.name} index could not apply: {e}")
+                self.ready = True
+
+    def upsert(self, movie):
+        """Add or replace a movie document in the index"""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((self._upsert, movie))
+            else:
+                self._upsert(movie)
+
+    def upsert_many(self, movies):
+        """Add or replace several movie documents under one lock acquisition"""
+        with self._lock:
+            for movie in movies:
+                if self._journal is not None:
+                    self._journal.append((self._upsert, movie))
+                else:
+                    self._upsert(movie)
+
+    def remove(self, movie_id):
+        """Drop a movie from the index"""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((self._remove, str(movie_id)))
+            else:
+                self._remove(str(movie_id))
+
+    def _load(self, collection):
+        raise NotImplementedError
+
+    def _install(self, state):
+        raise NotImplementedError
+
+    def _upsert(self, movie):
+        raise NotImplementedError
+
+    def _remove(self, movie_id):
+        raise NotImplementedError
+
+
+class IndexSync:
+    """Keeps in-memory indexes in step with writes made by any process.
+
+    ``start`` opens a change stream on the collection before the indexes are
+    first built, so every later write reaches them; events that arrive during
+    a build are journaled by the index and replayed on top of the loaded state.
+    A dropped stream resumes from its last resume token, and when that position
+    is gone the stream is reopened and the indexes rebuilt. A standalone server
+    has no change streams: there the indexes only see this process's own
+    writes, unless ``resync_interval`` > 0 asks for a full rebuild that often.
+    """
+
+    def __init__(self, collection, indexes, resync_interval=0.0, max_lag=10.0,
+                 initial_backoff=0.5, max_backoff=30.0):
+        self._collection = collection
+        self._indexes = list(indexes)
+        self.resync_interval = resync_interval
+        self.max_lag = max_lag
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._mode = 'stopped'
+        self._stream = None
+        self._resume_token = None
+        self._needs_rebuild = False
+        self._synced_at = None
+        self._last_rebuild_seconds = 0.0
+        self._events = 0
+        self._skipped = 0
+        self._rebuilds = 0
+        self._thread = None
+
+    def start(self):
+        """Start following writes; call before the indexes are first built"""
+        if self._mode != 'stopped':
+            return
+
+        try:
+            self._stream = self._open()
+            self._mode = 'change_stream'
+            target = self._follow
+        except OperationFailure as e:
+            if e.code != CHANGE_STREAMS_UNSUPPORTED:
+                raise
+            self._synced_at = time.monotonic()
+            if self.resync_interval <= 0:
+                print("⚠️ MongoDB has no change streams: in-memory indexes only see writes made through this process")
+                self._mode = 'local_writes'
+                return
+            print(f"⚠️ MongoDB has no change streams, rebuilding in-memory indexes every {self.resync_interval:.0f}s")
+            self._mode = 'periodic_rebuild'
+            target = self._rebuild_periodically
+
+        self._synced_at = time.monotonic()
+        self._thread = threading.Thread(target=target, name='index-sync', daemon=True)
+        self._thread.start()
+
+    def _open(self):
+        return self._collection.watch(
+            full_document='updateLookup',
+            resume_after=self._resume_token,
+            max_await_time_ms=1000
+        )
+
+    def _close(self):
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except PyMongoError:
+                pass
+            self._stream = None
+
+    def _follow(self):
+        backoff = self.initial_backoff
+        while True:
+            try:
+                if self._stream is None:
+                    self._stream = self._open()
+                if self._needs_rebuild:
+                    self._rebuild()
+                    self._needs_rebuild = False
+
+                change = self._stream.try_next()
+                self._resume_token = self._stream.resume_token
+                if change is None:
+                    # Nothing pending: every write up to now has been applied
+                    self._synced_at = time.monotonic()
+                else:
+                    self._apply(change)
+                    if change.get('clusterTime') is not None:
+                        behind = max(0.0, time.time() - change['clusterTime'].time)
+                        self._synced_at = max(self._synced_at or 0.0, time.monotonic() - behind)
+                backoff = self.initial_backoff
+            except OperationFailure as e:
+                if e.code in CHANGE_STREAM_LOST:
+                    print(f"❌ Change stream cannot be resumed, rebuilding in-memory indexes: {e}")
+                    self._restart()
+                else:
+                    print(f"❌ Change stream failed, resuming in {backoff:.1f}s: {e}")
+                    self._close()
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            except PyMongoError as e:
+                print(f"❌ Change stream interrupted, resuming in {backoff:.1f}s: {e}")
+                self._close()
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            except Exception as e:
+                # Anything else (e.g. a rebuild tripping over a malformed document) must not end the thread
+                print(f"❌ Index sync failed, retrying in {backoff:.1f}s: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    def _restart(self):
+        """Drop the stream position; the next round opens a fresh stream and rebuilds on top of it"""
+        self._close()
+        self._resume_token = None
+        self._needs_rebuild = True
+
+    def _apply(self, change):
+        operation = change['operationType']
+        if operation in ('insert', 'update', 'replace'):
+            movie = change.get('fullDocument')
+            # None when the movie was deleted before the lookup; its delete event follows
+            if movie is not None:
+                self._apply_to_indexes(lambda index: index.upsert(movie))
+        elif operation == 'delete':
+            self._apply_to_indexes(lambda index: index.remove(change['documentKey']['_id']))
+        elif operation in ('drop', 'rename', 'dropDatabase', 'invalidate'):
+            self._restart()
+            return
+        with self._lock:
+            self._events += 1
+
+    def _apply_to_indexes(self, apply):
+        for index in self._indexes:
+            try:
+                apply(index)
+            except Exception as e:
+                # e.g. a document written straight to MongoDB with a string rating: skip it, keep following
+                print(f"❌ Skipped a change the {index.name} index could not apply: {e}")
+                with self._lock:
+                    self._skipped += 1
+
+    def _rebuild(self):
+        started = time.monotonic()
+        for index in self._indexes:
+            index.build(self._collection)
+        self._synced_at = started
+        self._last_rebuild_seconds = time.monotonic() - started
+        with self._lock:
+            self._rebuilds += 1
+
+    def _rebuild_periodically(self):
+        while True:
+            time.sleep(self.resync_interval)
+            try:
+                self._rebuild()
+            except Exception as e:
+                print(f"❌ Rebuilding in-memory indexes failed: {e}")
+
+    def is_running(self):
+        """Whether the thread applying other processes' writes is alive (None when there is no such thread)"""
+        return self._thread.is_alive() if self._thread is not None else None
+
+    def is_current(self):
+        """Whether the indexes include every write made more than max_lag seconds ago (resync_interval when rebuilding)"""
+        if self._mode == 'local_writes':
+            # Nothing to follow: this process applies its own writes as it makes them
+            return True
+        if not self.is_running():
+            return False
+        synced_at = self._synced_at
+        if synced_at is None:
+            return False
+        allowed = self.max_lag
+        if self._mode == 'periodic_rebuild':
+            allowed += self.resync_interval + self._last_rebuild_seconds
+        return time.monotonic() - synced_at <= allowed
+
+    def stats(self):
+        synced_at = self._synced_at
+        with self._lock:
+            return {
+                'mode': self._mode,
+                'running': self.is_running(),
+                'current': self.is_current(),
+                'seconds_since_sync': round(time.monotonic() - synced_at, 2) if synced_at is not None else None,
+                'events': self._events,
+                'skipped': self._skipped,
+                'rebuilds': self._rebuilds,
+            }
@@ -0,0 +1,154 @@
+from bisect import bisect_left, insort
+from datetime import datetime
+
+from indexes import MovieIndex
+from models import normalize_genres
+
+LEADERBOARD_FIELDS = ('rating', 'release_year', 'created_at')
+# Values of any other type (e.g. a rating written to MongoDB as a string) keep a movie off that board
+LEADERBOARD_TYPES = {'rating': (int, float), 'release_year': (int, float), 'created_at': (datetime,)}
+LEADERBOARD_PROJECTION = {
+    'title': 1, 'genre': 1, 'genres': 1, 'director': 1,
+    'rating': 1, 'release_year': 1, 'created_at': 1,
+}
+
+
+def movie_genres(movie):
+    return movie.get('genres') or normalize_genres(movie.get('genre'))
+
+
+class _Board:
+    """Top entries for one (field, genre) pair, kept as an ascending list of (value, movie_id)"""
+
+    def __init__(self, entries=(), floor=None):
+        self.entries = list(entries)
+        # Highest value among movies in MongoDB that did not fit; None when nothing was left out
+        self.floor = floor
+        self.version = 0
+
+
+class LeaderboardIndex(MovieIndex):
+    """Bounded per-genre leaderboards for rating, release year and creation time.
+
+    Each board holds at most ``capacity`` movies and is updated on every write,
+    so reading the top k is O(k). Boards are loaded on startup from index-backed
+    ``sort().limit()`` queries; a board that has lost members to deletes and can
+    no longer answer k from memory is reloaded from MongoDB on read.
+    """
+
+    name = 'leaderboard'
+
+    def __init__(self, capacity=100):
+        super().__init__()
+        self.capacity = capacity
+        self._collection = None
+        self._boards = {}
+        self._records = {}
+        # movie_id -> {board key: value stored on that board}, so removals never depend on fresh data
+        self._memberships = {}
+
+    def _query(self, collection, field, genre, limit=None):
+        movie_filter = {field: {'$ne': None}}
+        if genre is not None:
+            movie_filter['genres'] = genre
+        cursor = collection.find(movie_filter, LEADERBOARD_PROJECTION).sort(field, -1).limit(limit or self.capacity)
+        return [self._record(movie) for movie in cursor]
+
+    def _fill(self, key, records):
+        entries = sorted((record[key[0]], record['_id']) for record in records)
+        self._boards[key] = _Board(entries, floor=entries[0][0] if len(entries) >= self.capacity else None)
+        for record in records:
+            self._hold(key, record)
+
+    def _load(self, collection):
+        self._collection = collection
+        genres = [None] + [g for g in collection.distinct('genres') if g]
+        return {
+            (field, genre): self._query(collection, field, genre)
+            for field in LEADERBOARD_FIELDS
+            for genre in genres
+        }
+
+    def _install(self, state):
+        self._boards, self._records, self._memberships = {}, {}, {}
+        for key, records in state.items():
+            self._fill(key, records)
+
+    @staticmethod
+    def _record(movie):
+        record = {field: movie.get(field) for field in LEADERBOARD_PROJECTION}
+        for field, types in LEADERBOARD_TYPES.items():
+            if not isinstance(record[field], types) or isinstance(record[field], bool):
+                record[field] = None
+        record['_id'] = str(movie['_id'])
+        record['genres'] = movie_genres(movie)
+        return record
+
+    def _board_keys(self, record):
+        for field in LEADERBOARD_FIELDS:
+            if record.get(field) is None:
+                continue
+            for genre in [None] + list(record['genres']):
+                yield field, genre
+
+    def _hold(self, key, record):
+        self._records[record['_id']] = record
+        self._memberships.setdefault(record['_id'], {})[key] = record[key[0]]
+
+    def _release(self, key, movie_id):
+        memberships = self._memberships.get(movie_id, {})
+        memberships.pop(key, None)
+        if not memberships:
+            self._memberships.pop(movie_id, None)
+            self._records.pop(movie_id, None)
+
+    def _upsert(self, movie):
+        self._remove(str(movie['_id']))
+        record = self._record(movie)
+
+        for key in self._board_keys(record):
+            board = self._boards.setdefault(key, _Board())
+            value = record[key[0]]
+            # At or below the floor the movie ranks among the ones not kept in memory
+            if board.floor is not None and value <= board.floor:
+                continue
+            insort(board.entries, (value, record['_id']))
+            self._hold(key, record)
+            if len(board.entries) > self.capacity:
+                evicted_value, evicted_id = board.entries.pop(0)
+                board.floor = evicted_value if board.floor is None else max(board.floor, evicted_value)
+                self._release(key, evicted_id)
+            board.version += 1
+
+    def _remove(self, movie_id):
+        for key, value in self._memberships.pop(movie_id, {}).items():
+            board = self._boards[key]
+            position = bisect_left(board.entries, (value, movie_id))
+            if position < len(board.entries) and board.entries[position] == (value, movie_id):
+                del board.entries[position]
+                board.version += 1
+        self._records.pop(movie_id, None)
+
+    def top(self, field, genre=None, k=10):
+        """Return the k best movies by field, optionally within one genre"""
+        key = (field, genre)
+        with self._lock:
+            board = self._boards.get(key)
+            if board is None:
+                return []
+            if board.floor is None or len(board.entries) >= k:
+                return [self._records[movie_id] for _, movie_id in board.entries[:-k - 1:-1]]
+            version = board.version
+
+        # Deletes left the board short: reload it outside the lock and keep it only if no write raced us
+        records = self._query(self._collection, field, genre)
+        with self._lock:
+            if self._boards.get(key) is board and board.version == version:
+                for _, movie_id in board.entries:
+                    self._release(key, movie_id)
+                self._fill(key, records)
+        return records[:k]
+
+    def query_top(self, field, genre=None, k=10):
+        """Return the k best movies straight from MongoDB, bypassing the in-memory boards"""
+        return self._query(self._collection, field, genre, limit=k)
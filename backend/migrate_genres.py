@@ -0,0 +1,57 @@
+"""Backfill the genres array for movies stored with only a comma-separated genre string,
+and give every genre one spelling across the collection.
+
+A genre stored all in lower or upper case ("sci-fi", "SCI-FI") becomes "Sci-Fi"
+unless another movie spells it with deliberate mixed case, which then wins:
+"TV Movie" is never rewritten, and "Tv Movie" or "tv movie" become "TV Movie"
+wherever any movie still has that spelling.
+
+Safe to run more than once: only documents whose genres are missing or not canonical are touched.
+
+    python migrate_genres.py
+"""
+import os
+
+from pymongo import MongoClient, UpdateOne
+
+from models import genre_spellings, normalize_genres
+
+BATCH_SIZE = 1000
+
+
+def migrate_genres(collection):
+    """Normalize genre strings into an indexed genres array, returning the number of updated movies"""
+    collection.create_index('genres')
+
+    stored = collection.distinct('genres')
+    for genre in collection.distinct('genre'):
+        if isinstance(genre, str):
+            stored.extend(genre.split(','))
+    spellings = genre_spellings(stored)
+
+    updated = 0
+    batch = []
+    for movie in collection.find({}, {'genre': 1, 'genres': 1}):
+        genres = normalize_genres(movie.get('genres') or movie.get('genre'), spellings)
+        if movie.get('genres') == genres and movie.get('genre') == ', '.join(genres):
+            continue
+        batch.append(UpdateOne(
+            {'_id': movie['_id']},
+            {'$set': {'genres': genres, 'genre': ', '.join(genres)}}
+        ))
+        if len(batch) >= BATCH_SIZE:
+            updated += collection.bulk_write(batch, ordered=False).modified_count
+            batch = []
+
+    if batch:
+        updated += collection.bulk_write(batch, ordered=False).modified_count
+    return updated
+
+
+if __name__ == '__main__':
+    database_name = os.getenv('MONGO_DATABASE', 'moviedb')
+    mongo_uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017/moviedb')
+
+    client = MongoClient(mongo_uri)
+    count = migrate_genres(client[database_name].movies)
+    print(f"✅ Migrated genres for {count} movies")
@@ -1,15 +1,85 @@
+import re
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Union
+
+GENRE_WORD = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+
+def _capitalize_words(name: str) -> str:
+    return GENRE_WORD.sub(lambda word: word.group(0).capitalize(), name)
+
+
+def _spelling_rank(name: str) -> int:
+    """How deliberate a spelling looks: "tv movie" < "Tv Movie" < "TV Movie" """
+    if name.islower() or name.isupper():
+        return 0
+    return 1 if name == _capitalize_words(name) else 2
+
+
+def canonical_genre(name: str, spellings: Optional[Dict[str, str]] = None) -> str:
+    """Trim a genre name and settle its case.
+
+    A genre found in ``spellings`` (see ``genre_spellings``) in any case takes
+    that spelling. Otherwise only a name written entirely in lower or upper
+    case is recased, so "sci-fi" and "SCI-FI" become "Sci-Fi" while "TV Movie"
+    stays as it was written.
+    """
+    name = ' '.join(name.split())
+    if spellings and name.casefold() in spellings:
+        return spellings[name.casefold()]
+    if name.islower() or name.isupper():
+        return _capitalize_words(name)
+    return name
+
+
+def genre_spellings(genres) -> Dict[str, str]:
+    """Map each case-folded genre to the spelling to use for it, given the genres already stored.
+
+    When the same genre is stored in several cases the most deliberate
+    spelling wins, so "TV Movie" is preferred over "Tv Movie" and "tv movie".
+    """
+    best = {}
+    for genre in genres:
+        if not isinstance(genre, str):
+            continue
+        name = ' '.join(genre.split())
+        if not name:
+            continue
+        current = best.get(name.casefold())
+        if current is None or _spelling_rank(name) > _spelling_rank(current):
+            best[name.casefold()] = name
+    return {key: canonical_genre(name) for key, name in best.items()}
+
+
+def normalize_genres(value: Union[str, List[str], None], spellings: Optional[Dict[str, str]] = None) -> List[str]:
+    """Split a "Action, Crime" string (or a list) into unique genre names, spelled as in ``spellings``"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        parts = value.split(',')
+    else:
+        parts = value if isinstance(value, (list, tuple)) else [value]
+
+    genres = []
+    seen = set()
+    for part in parts:
+        genre = canonical_genre(str(part), spellings)
+        if genre and genre.casefold() not in seen:
+            seen.add(genre.casefold())
+            genres.append(genre)
+    return genres
+
 
 class Movie:
-    def __init__(self, title: str, description: str, release_year: int, genre: str,
+    def __init__(self, title: str, description: str, release_year: int, genre: Union[str, List[str]],
                  director: str = "", rating: float = 0.0, _id: Optional[str] = None):
 
         self._id = _id
         self.title = title.strip() if title else ""
         self.description = description.strip() if description else ""
         self.release_year = int(release_year) if release_year else 0
-        self.genre = genre.strip() if genre else ""
+        self.genres = normalize_genres(genre)
+        self.genre = ', '.join(self.genres)
         self.director = director.strip() if director else ""
         self.rating = float(rating) if rating is not None else 0.0
         self.created_at = datetime.utcnow()
@@ -24,6 +94,7 @@ class Movie:
             'description': self.description,
             'release_year': self.release_year,
             'genre': self.genre,
+            'genres': self.genres,
             'director': self.director,
             'rating': self.rating,
             'created_at': self.created_at,
@@ -37,7 +108,7 @@ class Movie:
             title=data.get('title', ''),
             description=data.get('description', ''),
             release_year=data.get('release_year', 0),
-            genre=data.get('genre', ''),
+            genre=data.get('genres') or data.get('genre', ''),
             director=data.get('director', ''),
             rating=data.get('rating', 0.0),
             _id=data.get('_id')
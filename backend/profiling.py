@@ -0,0 +1,133 @@
+import cProfile
+import functools
+import hmac
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from flask import g, jsonify, request
+
+TRUNCATED_STACK = '[truncated]'
+
+
+class Profiler:
+    """Admin-guarded profiling for the Flask handlers.
+
+    * Sampling: request threads are tagged with their endpoint and their stacks
+      are sampled from ``sys._current_frames()``, either continuously at a low
+      rate (``sample_hz``) or on demand for a few seconds with ``capture``.
+      Results are collapsed stacks (``endpoint;module:function;... count``) ready for
+      flamegraph.pl or speedscope.
+    * Per request: an admin request sent with ``X-Profile: 1`` runs under
+      cProfile and its pstats are kept for ``request_stats``.
+    """
+
+    def __init__(self, admin_token=None, sample_hz=0.0, max_stacks=5000, max_request_profiles=50):
+        self.admin_token = admin_token
+        self.sample_hz = sample_hz
+        self.max_stacks = max_stacks
+        self._routes = {}
+        self._continuous = Counter()
+        self._continuous_lock = threading.Lock()
+        self._request_profiles = deque(maxlen=max_request_profiles)
+        # cProfile cannot run two profilers at once, so opted-in requests take turns
+        self._cprofile_lock = threading.Lock()
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+        if self.sample_hz > 0:
+            threading.Thread(target=self._sample_continuously, name='profile-sampler', daemon=True).start()
+
+    def is_admin(self):
+        token = request.headers.get('X-Admin-Token', '')
+        # Compared as bytes: compare_digest rejects str arguments with non-ASCII characters
+        return bool(self.admin_token) and hmac.compare_digest(token.encode(), self.admin_token.encode())
+
+    def admin_only(self, view):
+        """Decorator that hides a route unless a valid X-Admin-Token is sent"""
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not self.is_admin():
+                return jsonify({'error': 'Endpoint not found'}), 404
+            return view(*args, **kwargs)
+        return wrapper
+
+    def _before_request(self):
+        self._routes[threading.get_ident()] = request.endpoint or request.path
+
+        if request.headers.get('X-Profile') == '1' and self.is_admin() and self._cprofile_lock.acquire(blocking=False):
+            g.profile = cProfile.Profile()
+            g.profile.enable()
+
+    def _teardown_request(self, error=None):
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile.disable()
+            self._request_profiles.append((request.endpoint or request.path, pstats.Stats(profile)))
+            self._cprofile_lock.release()
+
+        self._routes.pop(threading.get_ident(), None)
+
+    def _sample(self, counts, exclude=None):
+        frames = sys._current_frames()
+        for ident, route in list(self._routes.items()):
+            frame = frames.get(ident)
+            if frame is None or ident == exclude:
+                continue
+            stack = []
+            while frame is not None:
+                module = frame.f_globals.get('__name__') or os.path.basename(frame.f_code.co_filename)
+                stack.append(f"{module}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            stack.append(route)
+            key = ';'.join(reversed(stack))
+            if key in counts or len(counts) < self.max_stacks:
+                counts[key] += 1
+            else:
+                counts[TRUNCATED_STACK] += 1
+
+    def _sample_continuously(self):
+        interval = 1.0 / self.sample_hz
+        while True:
+            time.sleep(interval)
+            with self._continuous_lock:
+                self._sample(self._continuous)
+
+    @staticmethod
+    def _collapsed(counts):
+        return ''.join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+    def capture(self, seconds, hz=100):
+        """Sample all in-flight requests for the given number of seconds and return collapsed stacks"""
+        counts = Counter()
+        interval = 1.0 / hz
+        deadline = time.monotonic() + seconds
+        me = threading.get_ident()
+        while time.monotonic() < deadline:
+            self._sample(counts, exclude=me)
+            time.sleep(interval)
+        return self._collapsed(counts)
+
+    def continuous_stacks(self, reset=False):
+        """Collapsed stacks gathered by the low-rate background sampler"""
+        with self._continuous_lock:
+            collapsed = self._collapsed(self._continuous)
+            if reset:
+                self._continuous.clear()
+        return collapsed
+
+    def request_stats(self, route=None, limit=50):
+        """pstats report merged from the opted-in requests, optionally only for one endpoint"""
+        profiles = [stats for endpoint, stats in list(self._request_profiles) if route in (None, endpoint)]
+        if not profiles:
+            return ''
+        output = io.StringIO()
+        merged = pstats.Stats(stream=output)
+        merged.add(*profiles)
+        merged.sort_stats('cumulative').print_stats(limit)
+        return output.getvalue()
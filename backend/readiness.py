@@ -0,0 +1,92 @@
+import threading
+import time
+from datetime import datetime
+
+
+class ReadinessMonitor:
+    """Decides off the request path whether this process is ready to serve traffic.
+
+    A background thread pings the database, reconnecting with exponential
+    backoff while it is unreachable. Once connected it runs the warm-up steps
+    (index creation, in-memory index builds, cache pre-warming) in order,
+    retrying a failed step on the next round. Probes read the cached
+    ``snapshot`` and never touch the database themselves.
+    """
+
+    def __init__(self, ping, warm_up_steps, check_interval=10.0, initial_backoff=0.5, max_backoff=30.0):
+        self._ping = ping
+        self._steps = list(warm_up_steps)
+        self.check_interval = check_interval
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._database = 'connecting'
+        self._last_error = None
+        self._last_check = None
+        self._warm_up = {name: 'pending' for name, _ in self._steps}
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='readiness-monitor', daemon=True)
+            self._thread.start()
+
+    def _set(self, **changes):
+        with self._lock:
+            for name, value in changes.items():
+                setattr(self, f'_{name}', value)
+            self._last_check = datetime.utcnow()
+
+    def _run(self):
+        backoff = self.initial_backoff
+        while True:
+            try:
+                self._ping()
+            except Exception as e:
+                if self._database == 'connected':
+                    print(f"❌ Lost connection to MongoDB: {e}")
+                self._set(database='unavailable', last_error=str(e))
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+
+            if self._database != 'connected':
+                print("✅ Connected to MongoDB")
+            self._set(database='connected', last_error=None)
+
+            try:
+                self._warm()
+            except Exception as e:
+                print(f"❌ Warm-up failed, retrying in {backoff:.1f}s: {e}")
+                self._set(last_error=str(e))
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+
+            backoff = self.initial_backoff
+            time.sleep(self.check_interval)
+
+    def _warm(self):
+        for name, step in self._steps:
+            if self._warm_up[name] == 'done':
+                continue
+            started = time.monotonic()
+            try:
+                step()
+            except Exception as e:
+                with self._lock:
+                    self._warm_up[name] = f'failed: {e}'
+                raise
+            with self._lock:
+                self._warm_up[name] = 'done'
+            print(f"✅ Warm-up step {name} finished in {time.monotonic() - started:.2f}s")
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'ready': self._database == 'connected' and all(s == 'done' for s in self._warm_up.values()),
+                'database': self._database,
+                'warm_up': dict(self._warm_up),
+                'last_check': self._last_check,
+                'error': self._last_error,
+            }
@@ -0,0 +1,293 @@
+import re
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+from indexes import MovieIndex
+from models import normalize_genres
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset("""
+a about after all an and are as at be been but by for from has have he her his in into is it its
+of on or over she that the their them they this through to was were when which who will with
+""".split())
+
+SIMILARITY_PROJECTION = {'description': 1, 'genre': 1, 'genres': 1, 'director': 1}
+
+# Terms in more rows than this (and than this share of the catalog) are too common to look up candidates by
+COMMON_TERM_MIN_ROWS = 10000
+COMMON_TERM_SHARE = 0.05
+# How many of the best rows by their less common terms are rescored over all their terms
+RESCORED_CANDIDATES = 2000
+
+
+def movie_terms(movie):
+    """Turn the description, genre and director of a movie into term counts"""
+    description = (movie.get('description') or '').lower()
+    terms = [t for t in TOKEN_PATTERN.findall(description) if len(t) > 1 and t not in STOP_WORDS]
+
+    # Genres and directors are matched as whole values, not as words of the description
+    for genre in normalize_genres(movie.get('genres') or movie.get('genre')):
+        terms.append('genre:' + genre.lower())
+    director = (movie.get('director') or '').strip().lower()
+    if director:
+        terms.append('director:' + director)
+
+    return Counter(terms)
+
+
+class _Corpus:
+    """Term-frequency matrix of the catalog, one row per movie.
+
+    Rows are stored as raw (sublinear) term frequencies and weighted by IDF at
+    query time, so adding or removing a movie never rewrites other rows. The
+    IDF weights and the row norms that depend on them are refreshed when the
+    matrix is compacted; in between, new terms get their IDF when first seen
+    and existing ones keep slightly stale weights. New rows go to a small
+    pending block that is merged into the CSR base matrix once it grows past
+    ``compact_threshold``; deleted rows are masked out and dropped on
+    compaction. A column-major copy of the base lets a query score only the
+    rows that share a term with it.
+
+    Terms found in most rows (a popular genre, a word every synopsis uses)
+    would still make a query touch nearly the whole catalog, while adding
+    little weight to any score. Candidates are therefore the rows sharing one
+    of the query's less common terms, ranked by those terms alone; the best
+    ``RESCORED_CANDIDATES`` of them are then scored exactly over all terms.
+    Only when a movie has no less common term is every row sharing any term
+    scored.
+    """
+
+    def __init__(self, compact_threshold):
+        self.compact_threshold = compact_threshold
+        self.vocabulary = {}
+        self.doc_freq = np.zeros(1024)
+        self.idf = np.zeros(1024)
+        self.ids = []
+        self.rows = {}
+        self.alive = np.zeros(1024, dtype=bool)
+        self.live_count = 0
+        self.base = sparse.csr_matrix((0, 0))
+        self.base_columns = self.base.tocsc()
+        self.base_norms = np.zeros(0)
+        self.pending = []
+        self.pending_norms = []
+        self._pending_matrix = None
+
+    def _idf(self, doc_freq):
+        return np.log((1.0 + self.live_count) / (1.0 + doc_freq)) + 1.0
+
+    def _column(self, term):
+        column = self.vocabulary.get(term)
+        if column is None:
+            column = len(self.vocabulary)
+            self.vocabulary[term] = column
+            if column >= len(self.doc_freq):
+                self.doc_freq = np.concatenate([self.doc_freq, np.zeros(len(self.doc_freq))])
+                self.idf = np.concatenate([self.idf, np.zeros(len(self.idf))])
+            self.idf[column] = self._idf(1.0)
+        return column
+
+    def add(self, movie_id, terms):
+        columns = np.fromiter((self._column(t) for t in terms), dtype=np.int64, count=len(terms))
+        values = 1.0 + np.log(np.fromiter(terms.values(), dtype=np.float64, count=len(terms)))
+        self.doc_freq[columns] += 1
+
+        row = len(self.ids)
+        if row >= len(self.alive):
+            self.alive = np.concatenate([self.alive, np.zeros(len(self.alive), dtype=bool)])
+        self.ids.append(movie_id)
+        self.rows[movie_id] = row
+        self.alive[row] = True
+        self.live_count += 1
+
+        self.pending.append((columns, values))
+        self.pending_norms.append(np.sqrt(np.sum((values * self.idf[columns]) ** 2)))
+        self._pending_matrix = None
+        if len(self.pending) >= self.compact_threshold:
+            self.compact()
+
+    def remove(self, movie_id):
+        row = self.rows.pop(movie_id, None)
+        if row is None:
+            return
+        columns, _ = self._row_terms(row)
+        self.doc_freq[columns] -= 1
+        self.ids[row] = None
+        self.alive[row] = False
+        self.live_count -= 1
+
+        if len(self.ids) - self.live_count > max(self.compact_threshold, self.live_count):
+            self.compact()
+
+    def _row_terms(self, row):
+        base_rows = self.base.shape[0]
+        if row < base_rows:
+            start, end = self.base.indptr[row], self.base.indptr[row + 1]
+            return self.base.indices[start:end], self.base.data[start:end]
+        return self.pending[row - base_rows]
+
+    def compact(self):
+        """Merge pending rows into the base matrix, drop deleted rows and refresh IDF weights and row norms"""
+        blocks = [self.base] + ([self._pending()] if self.pending else [])
+        width = len(self.vocabulary)
+        matrix = sparse.vstack([self._widen(block, width) for block in blocks], format='csr')
+
+        keep = np.flatnonzero(self.alive[:len(self.ids)])
+        if len(keep) < len(self.ids):
+            matrix = matrix[keep]
+            self.ids = [self.ids[row] for row in keep]
+            self.rows = {movie_id: row for row, movie_id in enumerate(self.ids)}
+            self.alive = np.zeros(max(1024, 2 * len(self.ids)), dtype=bool)
+            self.alive[:len(self.ids)] = True
+
+        self.idf = self._idf(self.doc_freq)
+        weights = self.idf[:width] ** 2
+        self.base = matrix
+        self.base_columns = matrix.tocsc()
+        self.base_norms = np.sqrt(matrix.multiply(matrix) @ weights)
+        self.pending = []
+        self.pending_norms = []
+        self._pending_matrix = None
+
+    @staticmethod
+    def _widen(matrix, width):
+        matrix = matrix.tocsr()
+        if matrix.shape[1] < width:
+            # A new matrix over the same arrays: snapshots still hold the old one
+            matrix = sparse.csr_matrix((matrix.data, matrix.indices, matrix.indptr), shape=(matrix.shape[0], width))
+        return matrix
+
+    def _pending(self):
+        if self._pending_matrix is None:
+            lengths = np.fromiter((len(c) for c, _ in self.pending), dtype=np.int64, count=len(self.pending))
+            indptr = np.concatenate([[0], np.cumsum(lengths)])
+            indices = np.concatenate([c for c, _ in self.pending]) if self.pending else np.zeros(0, np.int64)
+            data = np.concatenate([v for _, v in self.pending]) if self.pending else np.zeros(0)
+            self._pending_matrix = sparse.csr_matrix(
+                (data, indices, indptr), shape=(len(self.pending), len(self.vocabulary))
+            )
+        return self._pending_matrix
+
+    def snapshot(self, movie_id):
+        """Everything a query needs, taken under the index lock; None if the movie is unknown.
+
+        Compaction and appends replace or extend these objects rather than
+        changing them, so the query itself can run without the lock.
+        """
+        row = self.rows.get(movie_id)
+        if row is None:
+            return None
+        columns, values = self._row_terms(row)
+        return _Snapshot(
+            row=row,
+            query=values * self.idf[columns] ** 2,
+            query_norm=np.sqrt(np.sum((values * self.idf[columns]) ** 2)),
+            columns=columns,
+            ids=self.ids,
+            alive=self.alive[:len(self.ids)].copy(),
+            live_count=self.live_count,
+            base=self.base,
+            base_columns=self.base_columns,
+            base_norms=self.base_norms,
+            pending=self._pending() if self.pending else None,
+            pending_norms=np.array(self.pending_norms),
+        )
+
+
+class _Snapshot:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def similar(self, k):
+        k = min(k, self.live_count - 1)
+        if k <= 0 or self.query_norm == 0:
+            return []
+
+        rows, dots = self._base_dots()
+        norms = self.base_norms[rows]
+        if self.pending is not None:
+            dense_query = np.zeros(self.pending.shape[1])
+            dense_query[self.columns] = self.query
+            rows = np.concatenate([rows, self.base_norms.shape[0] + np.arange(self.pending.shape[0])])
+            dots = np.concatenate([dots, self.pending @ dense_query])
+            norms = np.concatenate([norms, self.pending_norms])
+
+        keep = (dots > 0) & self.alive[rows] & (rows != self.row) & (norms > 0)
+        candidates = rows[keep]
+        if len(candidates) == 0:
+            return []
+        scores = dots[keep] / (norms[keep] * self.query_norm)
+
+        # Vectorized top-k: partition first, then only sort the k winners
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        # A movie removed after the snapshot was taken has its id cleared
+        matches = [(self.ids[candidates[i]], float(scores[i])) for i in top]
+        return [(movie_id, score) for movie_id, score in matches if movie_id is not None]
+
+    def _base_dots(self):
+        """Rows of the base matrix worth scoring and their dot product with the query"""
+        # Only rows that share a term with the query can score above zero
+        base = self.base_columns
+        in_base = self.columns < base.shape[1]
+        columns, query = self.columns[in_base], self.query[in_base]
+        starts, ends = base.indptr[columns], base.indptr[columns + 1]
+        rare = ends - starts <= max(COMMON_TERM_MIN_ROWS, COMMON_TERM_SHARE * self.live_count)
+        if not rare.any() or rare.all():
+            dots = base[:, columns] @ query
+            rows = np.flatnonzero(dots)
+            return rows, dots[rows]
+
+        starts, ends = starts[rare], ends[rare]
+        postings = np.concatenate([base.indices[s:e] for s, e in zip(starts, ends)])
+        weights = np.concatenate([base.data[s:e] for s, e in zip(starts, ends)])
+        weights *= np.repeat(query[rare], ends - starts)
+        partial = np.bincount(postings, weights=weights, minlength=base.shape[0])
+        rows = np.flatnonzero(partial > 0)
+        if len(rows) > RESCORED_CANDIDATES:
+            best = np.argpartition(-partial[rows] / self.base_norms[rows], RESCORED_CANDIDATES - 1)
+            rows = rows[best[:RESCORED_CANDIDATES]]
+        dense_query = np.zeros(base.shape[1])
+        dense_query[columns] = query
+        return rows, self.base[rows] @ dense_query
+
+
+class SimilarityIndex(MovieIndex):
+    """Content-based "similar movies" index using TF-IDF cosine similarity"""
+
+    name = 'similarity'
+
+    def __init__(self, compact_threshold=1024):
+        super().__init__()
+        self._compact_threshold = compact_threshold
+        self._corpus = _Corpus(compact_threshold)
+
+    def _load(self, collection):
+        corpus = _Corpus(self._compact_threshold)
+        for movie in collection.find({}, SIMILARITY_PROJECTION):
+            corpus.add(str(movie['_id']), movie_terms(movie))
+        corpus.compact()
+        return corpus
+
+    def _install(self, corpus):
+        self._corpus = corpus
+
+    def _upsert(self, movie):
+        movie_id = str(movie['_id'])
+        self._corpus.remove(movie_id)
+        self._corpus.add(movie_id, movie_terms(movie))
+
+    def _remove(self, movie_id):
+        self._corpus.remove(movie_id)
+
+    def similar(self, movie_id, k=10):
+        """Return up to k (movie_id, score) pairs most similar to the given movie, or None if unknown"""
+        # Hold the lock only to take a snapshot; scoring runs concurrently with writes
+        with self._lock:
+            snapshot = self._corpus.snapshot(str(movie_id))
+        if snapshot is None:
+            return None
+        return snapshot.similar(k)
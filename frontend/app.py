@@ -70,16 +70,22 @@ st.markdown("""
 def make_request(method, endpoint, data=None):
     """Make HTTP request to Flask API"""
     url = f"{API_BASE_URL}{endpoint}"
+    # Token of our last write, so reading a movie back sees it even when a secondary answers
+    headers = {}
+    if st.session_state.get("causal_token"):
+        headers["X-Causal-Token"] = st.session_state.causal_token
     try:
         if method == "GET":
-            response = requests.get(url)
+            response = requests.get(url, headers=headers)
         elif method == "POST":
-            response = requests.post(url, json=data)
+            response = requests.post(url, json=data, headers=headers)
         elif method == "PUT":
-            response = requests.put(url, json=data)
+            response = requests.put(url, json=data, headers=headers)
         elif method == "DELETE":
-            response = requests.delete(url)
+            response = requests.delete(url, headers=headers)
 
+        if response.headers.get("X-Causal-Token"):
+            st.session_state.causal_token = response.headers["X-Causal-Token"]
         return response.json(), response.status_code
     except requests.exceptions.ConnectionError:
         return {"error": "Could not connect to the server. Make sure Flask API is running."}, 500
@@ -101,6 +107,13 @@ def get_rating_class(rating):
         return "rating-low"
 
 
+def get_movie_genres(movie):
+    """Get the list of genres of a movie (older records only have the comma-separated string)"""
+    if movie.get('genres'):
+        return movie['genres']
+    return [g.strip() for g in movie.get('genre', '').split(',') if g.strip()]
+
+
 def search_movies():
     """Advanced search functionality"""
     st.subheader("🔍 Advanced Movie Search")
@@ -286,11 +299,11 @@ def display_all_movies():
                     movies = search_response.get("movies", [])
 
             # Filter by genre
-            all_genres = list(set([movie['genre'] for movie in movies]))
+            all_genres = list(set(genre for movie in movies for genre in get_movie_genres(movie)))
             selected_genre = st.selectbox("🎭 Filter by Genre", ["All Genres"] + sorted(all_genres))
 
             if selected_genre != "All Genres":
-                movies = [movie for movie in movies if movie['genre'] == selected_genre]
+                movies = [movie for movie in movies if selected_genre in get_movie_genres(movie)]
 
             # Sort options
             sort_option = st.selectbox("🔄 Sort by", ["Title", "Release Year", "Rating", "Recently Added"])
@@ -426,6 +439,8 @@ def analytics_dashboard():
 
         # Convert to DataFrame for analysis
         df = pd.DataFrame(movies)
+        df['genres'] = [get_movie_genres(movie) for movie in movies]
+        genres_df = df.explode('genres')
 
         # Basic metrics
         col1, col2, col3, col4 = st.columns(4)
@@ -438,7 +453,7 @@ def analytics_dashboard():
             st.metric("Average Rating", f"{avg_rating:.1f}/10")
 
         with col3:
-            total_genres = df['genre'].nunique()
+            total_genres = genres_df['genres'].nunique()
             st.metric("Total Genres", total_genres)
 
         with col4:
@@ -466,13 +481,13 @@ def analytics_dashboard():
         col1, col2 = st.columns(2)
 
         with col1:
-            genre_counts = df['genre'].value_counts()
+            genre_counts = genres_df['genres'].value_counts()
             st.bar_chart(genre_counts)
             st.caption("Movies by Genre")
 
         with col2:
             # Top genres by average rating
-            genre_ratings = df.groupby('genre')['rating'].mean().sort_values(ascending=False)
+            genre_ratings = genres_df.groupby('genres')['rating'].mean().sort_values(ascending=False)
             st.bar_chart(genre_ratings)
             st.caption("Average Rating by Genre")
 
@@ -486,12 +501,22 @@ def analytics_dashboard():
 
         with col1:
             st.subheader("🏆 Top Rated Movies")
-            top_movies = df.nlargest(10, 'rating')[['title', 'rating', 'genre', 'release_year']]
+            top_response, top_status = make_request("GET", "/movies/top?by=rating&k=10")
+            if top_status == 200:
+                top_movies = pd.DataFrame(top_response.get("movies", []),
+                                          columns=['title', 'rating', 'genre', 'release_year'])
+            else:
+                top_movies = df.nlargest(10, 'rating')[['title', 'rating', 'genre', 'release_year']]
             st.dataframe(top_movies, use_container_width=True)
 
         with col2:
             st.subheader("📅 Recent Movies")
-            recent_movies = df.nlargest(10, 'release_year')[['title', 'release_year', 'rating', 'genre']]
+            recent_response, recent_status = make_request("GET", "/movies/top?by=release_year&k=10")
+            if recent_status == 200:
+                recent_movies = pd.DataFrame(recent_response.get("movies", []),
+                                             columns=['title', 'release_year', 'rating', 'genre'])
+            else:
+                recent_movies = df.nlargest(10, 'release_year')[['title', 'release_year', 'rating', 'genre']]
             st.dataframe(recent_movies, use_container_width=True)
 
         # Director analysis (if directors are available)
@@ -28,6 +28,13 @@ db.createCollection('movies');
 // Create indexes for movies collection
 db.movies.createIndex({ "title": 1 });
 db.movies.createIndex({ "genre": 1 });
+db.movies.createIndex({ "genres": 1 }); // Multikey index for genre filters and facets
+db.movies.createIndex({ "rating": -1 });
+db.movies.createIndex({ "release_year": -1 });
+db.movies.createIndex({ "created_at": -1 });
+db.movies.createIndex({ "genres": 1, "rating": -1 }); // Per-genre leaderboards
+db.movies.createIndex({ "genres": 1, "release_year": -1 });
+db.movies.createIndex({ "genres": 1, "created_at": -1 });
 db.movies.createIndex({ "year": 1 });
 db.movies.createIndex({ "imdb_rating": -1 });
 db.movies.createIndex({ "title": "text", "description": "text" }); // For text search
@@ -42,6 +49,7 @@ db.movies.insertMany([
         "description": "Two imprisoned men bond over a number of years, finding solace and eventual redemption through acts of common decency.",
         "release_year": 1994,
         "genre": "Drama",
+        "genres": ["Drama"],
         "director": "Frank Darabont",
         "rating": 9.3,
         "created_at": new Date(),
@@ -52,6 +60,7 @@ db.movies.insertMany([
         "description": "The aging patriarch of an organized crime dynasty transfers control of his clandestine empire to his reluctant son.",
         "release_year": 1972,
         "genre": "Crime, Drama",
+        "genres": ["Crime", "Drama"],
         "director": "Francis Ford Coppola",
         "rating": 9.2,
         "created_at": new Date(),
@@ -62,6 +71,7 @@ db.movies.insertMany([
         "description": "When the menace known as The Joker wreaks havoc and chaos on the people of Gotham, Batman must accept one of the greatest psychological and physical tests.",
         "release_year": 2008,
         "genre": "Action, Crime, Drama",
+        "genres": ["Action", "Crime", "Drama"],
         "director": "Christopher Nolan",
         "rating": 9.0,
         "created_at": new Date(),
@@ -72,6 +82,7 @@ db.movies.insertMany([
         "description": "The lives of two mob hitmen, a boxer, a gangster and his wife intertwine in four tales of violence and redemption.",
         "release_year": 1994,
         "genre": "Crime, Drama",
+        "genres": ["Crime", "Drama"],
         "director": "Quentin Tarantino",
         "rating": 8.9,
         "created_at": new Date(),
@@ -82,6 +93,7 @@ db.movies.insertMany([
         "description": "A thief who steals corporate secrets through dream-sharing technology is given the inverse task of planting an idea.",
         "release_year": 2010,
         "genre": "Action, Sci-Fi, Thriller",
+        "genres": ["Action", "Sci-Fi", "Thriller"],
         "director": "Christopher Nolan",
         "rating": 8.8,
         "created_at": new Date(),
@@ -92,6 +104,7 @@ db.movies.insertMany([
         "description": "A computer hacker learns from mysterious rebels about the true nature of his reality and his role in the war against its controllers.",
         "release_year": 1999,
         "genre": "Action, Sci-Fi",
+        "genres": ["Action", "Sci-Fi"],
         "director": "Lana Wachowski",
         "rating": 8.7,
         "created_at": new Date(),